@@ -2,33 +2,42 @@
 Civic Complaints API — Clean Karachi (FastAPI + SQLModel, SQLite)
 Run:
   uvicorn app:app --reload --port 8000
+  uvicorn app:create_app --factory --port 8000   # settings from CIVIC_* env
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
+import math
 import os
 import sqlite3
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from typing import List, Optional
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Path, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, Response
 from pydantic import BaseModel, Field
-from sqlmodel import Field as ORMField, Session, SQLModel, create_engine, select, text
-from sqlalchemy import UniqueConstraint, inspect
+from sqlmodel import Field as ORMField, Session, SQLModel, select, text
+from sqlalchemy import UniqueConstraint, delete, func, insert, inspect, update
+from sqlalchemy.engine import Engine
+
+from .assignment import AssignmentPlanner
+from .coordination import PeriodicJob, startup_lock
+from .resources import Resources
+from .settings import Settings
+from .sla import SlaTracker
+from .summary_cache import CachedSummary
 
 # ----------------------------------------------------------------------------
 # DB setup with migration support
 # ----------------------------------------------------------------------------
-# Ensure data folder exists
-os.makedirs("data", exist_ok=True)
-
-engine = create_engine("sqlite:///data/civic.db", echo=False)
-
-def check_and_migrate_database():
+def check_and_migrate_database(engine: Engine):
     """Check if database needs migration and apply changes"""
     inspector = inspect(engine)
     
@@ -128,14 +137,58 @@ def check_and_migrate_database():
         
         logging.info("Database migration completed.")
 
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
-    check_and_migrate_database()
+def schema_fingerprint() -> int:
+    """Stable 28-bit hash of the declared tables, stored as PRAGMA user_version."""
+    parts = []
+    for table in sorted(SQLModel.metadata.tables.values(), key=lambda t: t.name):
+        cols = ",".join(f"{c.name}:{c.type}:{c.nullable}" for c in table.columns)
+        idx = ",".join(sorted(i.name for i in table.indexes if i.name))
+        parts.append(f"{table.name}({cols})[{idx}]")
+    return int(hashlib.sha1(";".join(parts).encode()).hexdigest()[:7], 16)
+
+def _schema_is_current(engine: Engine, fingerprint: int) -> bool:
+    with engine.connect() as conn:
+        return conn.exec_driver_sql("PRAGMA user_version").scalar() == fingerprint
+
+def create_db_and_tables(resources: Resources):
+    engine = resources.engine
+    fingerprint = schema_fingerprint()
+    # Fast path: a previous startup already verified this exact schema, so
+    # skip create_all and the inspector entirely
+    if _schema_is_current(engine, fingerprint):
+        return
+    # Serialised across workers so exactly one of them ever migrates
+    with startup_lock(f"{resources.settings.database_path}.lock"):
+        if _schema_is_current(engine, fingerprint):
+            return
+        SQLModel.metadata.create_all(engine)
+        check_and_migrate_database(engine)
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"PRAGMA user_version = {fingerprint}")
+
+def get_resources(request: Request) -> Resources:
+    return request.app.state.resources
 
-def get_session():
-    with Session(engine) as session:
+def get_session(resources: Resources = Depends(get_resources)):
+    with Session(resources.engine) as session:
         yield session
 
+def open_read_session(resources: Resources, route: str) -> Session:
+    settings = resources.settings
+    max_staleness = settings.read_route_staleness.get(route, settings.read_max_staleness)
+    return resources.replica.session(max_staleness)
+
+def read_session(route: str):
+    """Session dependency for read-only endpoints.
+
+    ``route`` keys into ``settings.read_route_staleness`` so individual
+    endpoints can demand fresher data than the global staleness bound.
+    """
+    def dependency(resources: Resources = Depends(get_resources)):
+        with open_read_session(resources, route) as session:
+            yield session
+    return dependency
+
 # ----------------------------------------------------------------------------
 # Enums
 # ----------------------------------------------------------------------------
@@ -150,6 +203,11 @@ class ComplaintStatus(str, Enum):
     RESOLVED = "resolved"
     REJECTED = "rejected"
 
+class EventKind(str, Enum):
+    CREATED = "created"
+    STATUS = "status"
+    VOTE = "vote"
+
 # ----------------------------------------------------------------------------
 # Models
 # ----------------------------------------------------------------------------
@@ -208,6 +266,37 @@ class TeamMember(SQLModel, table=True):
     role: Optional[str] = ORMField(default="Volunteer")
     joined_at: datetime = ORMField(default_factory=datetime.utcnow)
 
+class Attachment(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("complaint_id", "sha256", name="uq_attachment_once"),)
+    id: Optional[int] = ORMField(default=None, primary_key=True)
+    complaint_id: int = ORMField(foreign_key="complaint.id", index=True)
+    sha256: str = ORMField(index=True)  # file lives at data/attachments/<sha[:2]>/<sha[2:4]>/<sha>
+    content_type: str
+    size: int
+    filename: Optional[str] = None
+    created_at: datetime = ORMField(default_factory=datetime.utcnow)
+
+class ComplaintEvent(SQLModel, table=True):
+    # Append-only: rows are written in the same transaction as the change
+    # they describe and never updated
+    id: Optional[int] = ORMField(default=None, primary_key=True)
+    complaint_id: int = ORMField(foreign_key="complaint.id", index=True)
+    kind: EventKind
+    from_status: Optional[ComplaintStatus] = None
+    to_status: Optional[ComplaintStatus] = None
+    voter_id: Optional[str] = None
+    value: Optional[int] = None
+    created_at: datetime = ORMField(default_factory=datetime.utcnow, index=True)
+
+class TeamAssignment(SQLModel, table=True):
+    # One row per complaint: the unique constraint also stops two concurrent
+    # batch passes (e.g. in different workers) from double-assigning
+    __table_args__ = (UniqueConstraint("complaint_id", name="uq_assignment_complaint"),)
+    id: Optional[int] = ORMField(default=None, primary_key=True)
+    complaint_id: int = ORMField(foreign_key="complaint.id", index=True)
+    team_id: int = ORMField(foreign_key="team.id", index=True)
+    assigned_at: datetime = ORMField(default_factory=datetime.utcnow)
+
 # ----------------------------------------------------------------------------
 # Schemas
 # ----------------------------------------------------------------------------
@@ -306,6 +395,52 @@ class TeamMemberRead(BaseModel):
 class TeamDetail(TeamRead):
     members: List[TeamMemberRead] = []
 
+class AttachmentRead(BaseModel):
+    id: int
+    complaint_id: int
+    sha256: str
+    content_type: str
+    size: int
+    filename: Optional[str] = None
+    created_at: datetime
+    url: str
+    thumbnail_url: str
+
+class AssignmentRead(BaseModel):
+    complaint_id: int
+    team_id: int
+    assigned_at: datetime
+
+class AssignmentRun(BaseModel):
+    assigned: int
+    assignments: List[AssignmentRead] = []
+
+class ComplaintEventRead(BaseModel):
+    id: int
+    complaint_id: int
+    kind: EventKind
+    from_status: Optional[ComplaintStatus] = None
+    to_status: Optional[ComplaintStatus] = None
+    # The event's voter_id is deliberately not exposed (phone/CNIC hashes)
+    value: Optional[int] = None
+    created_at: datetime
+
+class OverdueComplaint(BaseModel):
+    id: int
+    title: str
+    status: ComplaintStatus
+    area_code_na: Optional[str] = None
+    area_code_ps: Optional[str] = None
+    created_at: datetime
+    deadline: datetime
+    hours_overdue: float
+
+class StatusDuration(BaseModel):
+    area: str
+    status: ComplaintStatus
+    avg_hours: float
+    count: int
+
 # ----------------------------------------------------------------------------
 # Constituency resolver
 # ----------------------------------------------------------------------------
@@ -341,34 +476,26 @@ def resolve_constituencies(lat: float, lng: float) -> tuple[str, str]:
     return "NA-000", "PS-000"
 
 # ----------------------------------------------------------------------------
-# App & middleware
+# Router
 # ----------------------------------------------------------------------------
-app = FastAPI(title="Civic Complaints API", version="0.2.0")
-
-# Enhanced CORS configuration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://127.0.0.1:3000",
-        "http://localhost:3001",
-        "http://127.0.0.1:3001",
-        "http://localhost:8000",
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@app.on_event("startup")
-def on_startup():
-    create_db_and_tables()
-    logging.basicConfig(level=logging.INFO)
-    logging.info("Civic Complaints API started successfully!")
+# Routes live on a module-level router; create_app() (bottom of file) builds
+# the FastAPI instance, middleware and per-app resources around it.
+router = APIRouter()
 
 # ----------------------------------------------------------------------------
 # Helpers
 # ----------------------------------------------------------------------------
+def load_blocked_voters(resources: Resources, path: str) -> int:
+    count = 0
+    with open(path) as fh:
+        for line in fh:
+            voter_id = line.strip()
+            if voter_id:
+                resources.vote_throttle.blocked.add(voter_id)
+                count += 1
+    logging.info(f"Loaded {count} blocked voter ids")
+    return count
+
 def attach_reps(session: Session, complaint: Complaint):
     mna = None
     mpa = None
@@ -435,6 +562,202 @@ def build_summary(session: Session, complaint_id: int) -> ComplaintSummary:
         votes_down=down,
     )
 
+def sync_sla_tracker(resources: Resources) -> SlaTracker:
+    """Apply event-log rows newer than the tracker's high-water mark.
+
+    Skipped entirely while PRAGMA data_version is unchanged, so steady-state
+    SLA reads cost no queries. Events from other workers are picked up too.
+    """
+    tracker = resources.sla_tracker
+    version = resources.data_version.current()
+    if version == tracker.synced_version:
+        return tracker
+    with tracker.lock, resources.replica.session(max_staleness=0) as session:
+        if tracker.synced_version is None:
+            # First use: complaints that predate the event log are seeded from
+            # the complaint table; everything else is replayed from the log
+            logged = select(ComplaintEvent.complaint_id).where(ComplaintEvent.kind != EventKind.VOTE)
+            for c in session.exec(select(Complaint).where(Complaint.id.not_in(logged))).all():
+                tracker.track(c.id, c.status.value, c.updated_at, c.created_at, (c.area_code_na, c.area_code_ps))
+        rows = session.exec(
+            select(ComplaintEvent, Complaint.created_at, Complaint.area_code_na, Complaint.area_code_ps)
+            .join(Complaint, Complaint.id == ComplaintEvent.complaint_id)
+            .where(ComplaintEvent.id > tracker.last_event_id, ComplaintEvent.kind != EventKind.VOTE)
+            .order_by(ComplaintEvent.id)
+        ).all()
+        for e, created_at, na, ps in rows:
+            if e.kind == EventKind.CREATED:
+                tracker.track(e.complaint_id, e.to_status.value, e.created_at, created_at, (na, ps))
+            elif e.kind == EventKind.STATUS:
+                tracker.transition(e.complaint_id, e.to_status.value, e.created_at, created_at, (na, ps))
+            tracker.last_event_id = e.id
+        tracker.synced_version = version
+    return tracker
+
+def _build_planner(session: Session, settings: Settings) -> AssignmentPlanner:
+    teams = session.exec(select(Team.id, Team.area).where(Team.is_active == True, Team.area != None)).all()
+    members = dict(session.exec(
+        select(TeamMember.team_id, func.count()).group_by(TeamMember.team_id)
+    ).all())
+    load = dict(session.exec(
+        select(TeamAssignment.team_id, func.count())
+        .join(Complaint, Complaint.id == TeamAssignment.complaint_id)
+        .where(Complaint.status.in_([ComplaintStatus.ASSIGNED, ComplaintStatus.IN_PROGRESS]))
+        .group_by(TeamAssignment.team_id)
+    ).all())
+    return AssignmentPlanner(
+        ((tid, area, members.get(tid, 0), load.get(tid, 0)) for tid, area in teams),
+        max_open_per_member=settings.assignment_max_open_per_member,
+    )
+
+def run_assignment_pass(
+    session: Session, resources: Resources, complaint_ids: Optional[List[int]] = None,
+) -> List[AssignmentRead]:
+    """Match unassigned NEW complaints to active teams in one transaction.
+
+    ``session`` must not be inside a transaction: the pass opens its own
+    with BEGIN IMMEDIATE, so the candidates it selects cannot be assigned or
+    have their status changed by another worker before it writes them.
+    """
+    settings = resources.settings
+    index = resources.assignment_index
+    try:
+        session.connection().exec_driver_sql("BEGIN IMMEDIATE")
+        planner = index.get(lambda: _build_planner(session, settings))
+        if planner.exhausted():
+            session.rollback()
+            return []
+
+        q = (
+            select(Complaint.id, Complaint.area_code_na, Complaint.area_code_ps)
+            .where(Complaint.status == ComplaintStatus.NEW)
+            .where(Complaint.id.not_in(select(TeamAssignment.complaint_id)))
+        )
+        if complaint_ids is not None:
+            q = q.where(Complaint.id.in_(complaint_ids))
+        candidates = session.exec(q.order_by(Complaint.created_at).limit(settings.assignment_batch_size)).all()
+
+        now = datetime.utcnow()
+        made: List[AssignmentRead] = []
+        for cid, na, ps in candidates:
+            team_id = planner.pick(na, ps)
+            if team_id is not None:
+                made.append(AssignmentRead(complaint_id=cid, team_id=team_id, assigned_at=now))
+        if not made:
+            session.rollback()
+            return []
+
+        # Bulk executemany statements: thousands of rows per pass stay one
+        # transaction without per-object unit-of-work overhead
+        session.exec(insert(TeamAssignment), params=[
+            {"complaint_id": a.complaint_id, "team_id": a.team_id, "assigned_at": now} for a in made
+        ])
+        session.exec(insert(ComplaintEvent), params=[
+            {"complaint_id": a.complaint_id, "kind": EventKind.STATUS, "from_status": ComplaintStatus.NEW,
+             "to_status": ComplaintStatus.ASSIGNED, "created_at": now}
+            for a in made
+        ])
+        session.exec(update(Complaint), params=[
+            {"id": a.complaint_id, "status": ComplaintStatus.ASSIGNED, "updated_at": now} for a in made
+        ])
+        session.commit()
+    except BaseException:
+        session.rollback()
+        # The cached planner already booked this pass's picks
+        index.invalidate()
+        raise
+    resources.summary_cache.invalidate(a.complaint_id for a in made)
+    logging.info(f"Assigned {len(made)} complaints to teams")
+    return made
+
+def _assignment_to_read(a: TeamAssignment) -> AssignmentRead:
+    return AssignmentRead(complaint_id=a.complaint_id, team_id=a.team_id, assigned_at=a.assigned_at)
+
+def _event_to_read(e: ComplaintEvent) -> ComplaintEventRead:
+    return ComplaintEventRead(
+        id=e.id, complaint_id=e.complaint_id, kind=e.kind,
+        from_status=e.from_status, to_status=e.to_status,
+        value=e.value, created_at=e.created_at,
+    )
+
+def sync_summary_cache(resources: Resources) -> None:
+    """Drop cached summaries for complaints other workers have written to.
+
+    Rate-limited to one check per ``summary_cache_sync_interval``; between
+    checks a hit costs no database access at all.
+    """
+    cache = resources.summary_cache
+    now = time.monotonic()
+    if now < cache.next_sync:
+        return
+    cache.next_sync = now + resources.settings.summary_cache_sync_interval
+    version = resources.data_version.current()
+    if version == cache.synced_version:
+        return
+    with resources.replica.session(max_staleness=0) as session:
+        if cache.last_event_id is None:
+            cache.last_event_id = session.exec(select(func.max(ComplaintEvent.id))).one() or 0
+            cache.clear()
+        else:
+            rows = session.exec(
+                select(ComplaintEvent.id, ComplaintEvent.complaint_id).where(ComplaintEvent.id > cache.last_event_id)
+            ).all()
+            if rows:
+                cache.invalidate({cid for _, cid in rows})
+                cache.last_event_id = max(eid for eid, _ in rows)
+    cache.synced_version = version
+
+def cached_summary(resources: Resources, complaint_id: int) -> CachedSummary:
+    sync_summary_cache(resources)
+    cache = resources.summary_cache
+    entry = cache.get(complaint_id)
+    if entry is not None:
+        return entry
+    epoch = cache.epoch
+    # Always fill from a live read: a snapshot could predate the invalidation
+    # that caused this miss, and the stale entry would then outlive it
+    with resources.replica.session(max_staleness=0) as session:
+        s = build_summary(session, complaint_id)
+    read = ComplaintRead(**s.model_dump(include=set(ComplaintRead.model_fields)))
+    entry = CachedSummary(
+        summary_json=s.model_dump_json().encode(),
+        complaint_json=read.model_dump_json().encode(),
+        rep_ids=tuple(r.id for r in (s.mna, s.mpa) if r),
+    )
+    cache.put(complaint_id, entry, epoch)
+    return entry
+
+def _attachment_to_read(a: Attachment) -> AttachmentRead:
+    return AttachmentRead(
+        id=a.id, complaint_id=a.complaint_id, sha256=a.sha256,
+        content_type=a.content_type, size=a.size, filename=a.filename,
+        created_at=a.created_at,
+        url=f"/attachments/{a.sha256}",
+        thumbnail_url=f"/attachments/{a.sha256}/thumbnail",
+    )
+
+def _complaint_exists(resources: Resources, complaint_id: int) -> bool:
+    with Session(resources.engine) as session:
+        return session.get(Complaint, complaint_id) is not None
+
+def _record_attachment(
+    resources: Resources, complaint_id: int, sha256: str, size: int,
+    content_type: str, filename: Optional[str],
+) -> AttachmentRead:
+    with Session(resources.engine) as session:
+        a = session.exec(
+            select(Attachment).where(Attachment.complaint_id == complaint_id, Attachment.sha256 == sha256)
+        ).first()
+        if not a:
+            a = Attachment(
+                complaint_id=complaint_id, sha256=sha256, content_type=content_type,
+                size=size, filename=filename,
+            )
+            session.add(a)
+            session.commit()
+            session.refresh(a)
+        return _attachment_to_read(a)
+
 def _team_to_read(session: Session, t: Team) -> TeamRead:
     members = session.exec(select(TeamMember).where(TeamMember.team_id == t.id)).all()
     return TeamRead(
@@ -496,7 +819,7 @@ def _compute_impact(session: Session) -> dict:
 # ----------------------------------------------------------------------------
 # Root endpoint
 # ----------------------------------------------------------------------------
-@app.get("/")
+@router.get("/")
 def root():
     return {
         "message": "Civic Complaints API is running!",
@@ -513,7 +836,7 @@ def root():
 # ----------------------------------------------------------------------------
 # About / Impact
 # ----------------------------------------------------------------------------
-@app.get("/about")
+@router.get("/about")
 def about():
     return {
         "title": "Community Powered — About Clean Karachi",
@@ -530,15 +853,24 @@ def about():
         "sla": {"avg_resolution_time": "48 hours"},
     }
 
-@app.get("/impact")
-def impact(session: Session = Depends(get_session)):
-    return _compute_impact(session)
+def _load_impact(resources: Resources) -> dict:
+    # Live read: the cache reloads when data_version moves, and a snapshot
+    # could predate that very commit and then be kept until the next one
+    with resources.replica.session(max_staleness=0) as session:
+        return _compute_impact(session)
+
+@router.get("/impact")
+def impact(resources: Resources = Depends(get_resources)):
+    return resources.impact_cache.get_or_load("impact", lambda: _load_impact(resources))
 
 # ----------------------------------------------------------------------------
 # Representatives
 # ----------------------------------------------------------------------------
-@app.post("/seed/representatives", response_model=List[RepresentativeRead])
-def seed_representatives(items: List[SeedRep], session: Session = Depends(get_session)):
+@router.post("/seed/representatives", response_model=List[RepresentativeRead])
+def seed_representatives(
+    items: List[SeedRep],
+    session: Session = Depends(get_session), resources: Resources = Depends(get_resources),
+):
     reps: List[Representative] = []
     for it in items:
         exists = session.exec(
@@ -559,6 +891,9 @@ def seed_representatives(items: List[SeedRep], session: Session = Depends(get_se
     session.commit()
     for r in reps:
         session.refresh(r)
+    # Summaries embed representative details
+    rep_ids = {r.id for r in reps}
+    resources.summary_cache.invalidate_where(lambda e: not rep_ids.isdisjoint(e.rep_ids))
     return [
         RepresentativeRead(
             id=r.id, role=r.role, code=r.code, name=r.name,
@@ -567,8 +902,8 @@ def seed_representatives(items: List[SeedRep], session: Session = Depends(get_se
         for r in reps
     ]
 
-@app.get("/representatives", response_model=List[RepresentativeRead])
-def list_representatives(session: Session = Depends(get_session)):
+@router.get("/representatives", response_model=List[RepresentativeRead])
+def list_representatives(session: Session = Depends(read_session("list_representatives"))):
     rows = session.exec(select(Representative)).all()
     return [
         RepresentativeRead(
@@ -581,8 +916,11 @@ def list_representatives(session: Session = Depends(get_session)):
 # ----------------------------------------------------------------------------
 # Complaints
 # ----------------------------------------------------------------------------
-@app.post("/complaints", response_model=ComplaintSummary)
-def create_complaint(payload: ComplaintCreate, session: Session = Depends(get_session)):
+@router.post("/complaints", response_model=ComplaintSummary)
+def create_complaint(
+    payload: ComplaintCreate,
+    session: Session = Depends(get_session), resources: Resources = Depends(get_resources),
+):
     na = payload.area_code_na
     ps = payload.area_code_ps
     if not na or not ps:
@@ -600,21 +938,30 @@ def create_complaint(payload: ComplaintCreate, session: Session = Depends(get_se
         area_code_ps=ps,
         status=ComplaintStatus.NEW,
     )
-    session.add(c)
-    session.commit()
-    session.refresh(c)
-
     # auto-attach representatives if present
     attach_reps(session, c)
-    c.updated_at = datetime.utcnow()
     session.add(c)
+    # Flush for the id so the CREATED event commits together with the row
+    session.flush()
+    session.add(ComplaintEvent(
+        complaint_id=c.id, kind=EventKind.CREATED, to_status=c.status, created_at=c.created_at,
+    ))
     session.commit()
     session.refresh(c)
 
+    if resources.settings.assignment_mode == "on_create":
+        # The complaint is already committed: a failed pass must not turn
+        # into a 500 (and a client retry into a duplicate). The periodic or
+        # manual pass picks it up later.
+        try:
+            run_assignment_pass(session, resources, complaint_ids=[c.id])
+        except Exception as e:
+            logging.error(f"Assignment on create failed for complaint {c.id}: {e}")
+
     return build_summary(session, c.id)
 
-@app.get("/complaints", response_model=List[ComplaintRead])
-def list_complaints(session: Session = Depends(get_session)):
+@router.get("/complaints", response_model=List[ComplaintRead])
+def list_complaints(session: Session = Depends(read_session("list_complaints"))):
     try:
         rows = session.exec(select(Complaint).order_by(Complaint.created_at.desc())).all()
         return [
@@ -631,30 +978,37 @@ def list_complaints(session: Session = Depends(get_session)):
         logging.error(f"Error listing complaints: {e}")
         raise HTTPException(500, "Internal server error")
 
-@app.get("/complaints/{complaint_id}", response_model=ComplaintRead)
-def get_complaint(complaint_id: int, session: Session = Depends(get_session)):
-    c = session.get(Complaint, complaint_id)
-    if not c:
-        raise HTTPException(404, "Complaint not found")
-    return ComplaintRead(
-        id=c.id, title=c.title, description=c.description,
-        lat=c.lat, lng=c.lng, address=c.address,
-        area_code_na=c.area_code_na, area_code_ps=c.area_code_ps,
-        status=c.status, created_at=c.created_at, updated_at=c.updated_at,
-        resolved_at=c.resolved_at
-    )
+@router.get("/complaints/{complaint_id}", response_model=ComplaintRead)
+def get_complaint(complaint_id: int, resources: Resources = Depends(get_resources)):
+    entry = cached_summary(resources, complaint_id)
+    return Response(entry.complaint_json, media_type="application/json")
 
-@app.patch("/complaints/{complaint_id}/status", response_model=ComplaintRead)
-def update_status(complaint_id: int, payload: StatusUpdate, session: Session = Depends(get_session)):
+@router.patch("/complaints/{complaint_id}/status", response_model=ComplaintRead)
+def update_status(
+    complaint_id: int, payload: StatusUpdate,
+    session: Session = Depends(get_session), resources: Resources = Depends(get_resources),
+):
     c = session.get(Complaint, complaint_id)
     if not c:
         raise HTTPException(404, "Complaint not found")
+    now = datetime.utcnow()
+    if payload.status != c.status:
+        session.add(ComplaintEvent(
+            complaint_id=c.id, kind=EventKind.STATUS,
+            from_status=c.status, to_status=payload.status, created_at=now,
+        ))
+        if payload.status == ComplaintStatus.NEW:
+            # Back in the queue: drop the old assignment so a pass can place it again
+            session.exec(delete(TeamAssignment).where(TeamAssignment.complaint_id == c.id))
     c.status = payload.status
-    c.updated_at = datetime.utcnow()
+    c.updated_at = now
     if payload.status == ComplaintStatus.RESOLVED and c.resolved_at is None:
-        c.resolved_at = datetime.utcnow()
+        c.resolved_at = now
     session.add(c)
     session.commit()
+    resources.summary_cache.invalidate([complaint_id])
+    # Open/closed moves change team loads
+    resources.assignment_index.invalidate()
     session.refresh(c)
     return ComplaintRead(
         id=c.id, title=c.title, description=c.description,
@@ -667,8 +1021,18 @@ def update_status(complaint_id: int, payload: StatusUpdate, session: Session = D
 # ----------------------------------------------------------------------------
 # Voting
 # ----------------------------------------------------------------------------
-@app.post("/complaints/{complaint_id}/vote", response_model=ComplaintSummary)
-def vote(complaint_id: int, payload: VoteCreate, session: Session = Depends(get_session)):
+@router.post("/complaints/{complaint_id}/vote", response_model=ComplaintSummary)
+def vote(
+    complaint_id: int, payload: VoteCreate, request: Request,
+    session: Session = Depends(get_session), resources: Resources = Depends(get_resources),
+):
+    # Throttle before the first query; the session has not connected yet
+    status, retry_after = resources.vote_throttle.check(payload.voter_id, request.client.host if request.client else None)
+    if status == 403:
+        raise HTTPException(403, "Voter is blocked")
+    if status == 429:
+        raise HTTPException(429, "Too many votes, slow down", headers={"Retry-After": str(math.ceil(retry_after))})
+
     c = session.get(Complaint, complaint_id)
     if not c:
         raise HTTPException(404, "Complaint not found")
@@ -680,47 +1044,201 @@ def vote(complaint_id: int, payload: VoteCreate, session: Session = Depends(get_
         existing.value = payload.normalized()
     else:
         session.add(Vote(complaint_id=complaint_id, voter_id=payload.voter_id, value=payload.normalized()))
+    session.add(ComplaintEvent(
+        complaint_id=complaint_id, kind=EventKind.VOTE, voter_id=payload.voter_id, value=payload.normalized(),
+    ))
     session.commit()
+    resources.summary_cache.invalidate([complaint_id])
 
     return build_summary(session, complaint_id)
 
-@app.get("/complaints/{complaint_id}/summary", response_model=ComplaintSummary)
-def summary(complaint_id: int, session: Session = Depends(get_session)):
-    return build_summary(session, complaint_id)
+@router.get("/complaints/{complaint_id}/summary", response_model=ComplaintSummary)
+def summary(complaint_id: int, resources: Resources = Depends(get_resources)):
+    entry = cached_summary(resources, complaint_id)
+    return Response(entry.summary_json, media_type="application/json")
+
+# ----------------------------------------------------------------------------
+# Event log & SLA
+# ----------------------------------------------------------------------------
+@router.get("/complaints/{complaint_id}/events", response_model=List[ComplaintEventRead])
+def list_complaint_events(complaint_id: int, session: Session = Depends(read_session("list_complaint_events"))):
+    c = session.get(Complaint, complaint_id)
+    if not c:
+        raise HTTPException(404, "Complaint not found")
+    rows = session.exec(
+        select(ComplaintEvent).where(ComplaintEvent.complaint_id == complaint_id).order_by(ComplaintEvent.id)
+    ).all()
+    return [_event_to_read(e) for e in rows]
+
+@router.get("/sla/overdue", response_model=List[OverdueComplaint])
+def sla_overdue(
+    area: Optional[str] = None,
+    session: Session = Depends(read_session("sla_overdue")),
+    resources: Resources = Depends(get_resources),
+):
+    tracker = sync_sla_tracker(resources)
+    now = datetime.utcnow()
+    with tracker.lock:
+        due = tracker.overdue(now)
+    if not due:
+        return []
+    by_id = {
+        c.id: c for c in session.exec(select(Complaint).where(Complaint.id.in_([cid for cid, _ in due]))).all()
+    }
+    out: List[OverdueComplaint] = []
+    for cid, deadline in due:
+        c = by_id.get(cid)
+        if not c or (area and area not in (c.area_code_na, c.area_code_ps)):
+            continue
+        out.append(OverdueComplaint(
+            id=c.id, title=c.title, status=c.status,
+            area_code_na=c.area_code_na, area_code_ps=c.area_code_ps,
+            created_at=c.created_at, deadline=deadline,
+            hours_overdue=round((now - deadline).total_seconds() / 3600.0, 2),
+        ))
+    return out
+
+@router.get("/sla/durations", response_model=List[StatusDuration])
+def sla_durations(area: Optional[str] = None, resources: Resources = Depends(get_resources)):
+    tracker = sync_sla_tracker(resources)
+    with tracker.lock:
+        items = sorted(tracker.durations.items())
+    return [
+        StatusDuration(area=a, status=st, avg_hours=stats.avg_hours, count=stats.count)
+        for (a, st), stats in items
+        if area is None or a == area
+    ]
+
+# ----------------------------------------------------------------------------
+# Attachments (photos)
+# ----------------------------------------------------------------------------
+# Content never changes for a given hash, so clients and CDNs may cache forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+SHA256_PATTERN = r"^[0-9a-f]{64}$"
+
+# The body is parsed by hand (see MultipartUpload), so describe it for /docs
+UPLOAD_OPENAPI = {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+    "type": "object", "required": ["file"],
+    "properties": {"file": {"type": "string", "format": "binary"}},
+}}}}}
+
+@router.post(
+    "/complaints/{complaint_id}/attachments", response_model=AttachmentRead, openapi_extra=UPLOAD_OPENAPI,
+)
+async def upload_attachment(complaint_id: int, request: Request, resources: Resources = Depends(get_resources)):
+    # Not UploadFile: Starlette would spool the whole body to a temp file
+    # before this runs. The raw stream is parsed instead, and file bytes are
+    # hashed and written straight into the store, off the event loop.
+    from .attachments import (
+        MULTIPART_OVERHEAD, AttachmentTooLarge, InvalidUpload, MultipartUpload, UnsupportedContentType,
+    )
+
+    store = resources.attachment_store
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > store.max_bytes + MULTIPART_OVERHEAD:
+        raise HTTPException(413, f"Attachment exceeds {store.max_bytes} bytes")
+    if not await run_in_threadpool(_complaint_exists, resources, complaint_id):
+        raise HTTPException(404, "Complaint not found")
+
+    try:
+        upload = MultipartUpload(store, request.headers.get("content-type", ""))
+        try:
+            async for chunk in request.stream():
+                await run_in_threadpool(upload.feed, chunk)
+            sha256, size, _ = await run_in_threadpool(upload.finish)
+        except BaseException:
+            upload.abort()
+            raise
+    except AttachmentTooLarge as e:
+        raise HTTPException(413, str(e))
+    except UnsupportedContentType as e:
+        raise HTTPException(415, str(e))
+    except InvalidUpload as e:
+        raise HTTPException(422, str(e))
+
+    a = await run_in_threadpool(
+        _record_attachment, resources, complaint_id, sha256, size, upload.content_type, upload.filename,
+    )
+    # Off the event loop too: the first call spawns the process pool
+    await run_in_threadpool(store.schedule_thumbnail, sha256)
+    return a
+
+@router.get("/complaints/{complaint_id}/attachments", response_model=List[AttachmentRead])
+def list_attachments(complaint_id: int, session: Session = Depends(read_session("list_attachments"))):
+    rows = session.exec(
+        select(Attachment).where(Attachment.complaint_id == complaint_id).order_by(Attachment.created_at)
+    ).all()
+    return [_attachment_to_read(a) for a in rows]
+
+@router.get("/attachments/{sha256}")
+def get_attachment(
+    sha256: str = Path(..., pattern=SHA256_PATTERN),
+    session: Session = Depends(read_session("get_attachment")),
+    resources: Resources = Depends(get_resources),
+):
+    a = session.exec(select(Attachment).where(Attachment.sha256 == sha256)).first()
+    path = resources.attachment_store.path_for(sha256)
+    if not a or not os.path.exists(path):
+        raise HTTPException(404, "Attachment not found")
+    # FileResponse streams from disk and honours Range / If-Range
+    return FileResponse(
+        path, media_type=a.content_type,
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": f'"{sha256}"'},
+    )
+
+@router.get("/attachments/{sha256}/thumbnail")
+def get_attachment_thumbnail(
+    sha256: str = Path(..., pattern=SHA256_PATTERN),
+    resources: Resources = Depends(get_resources),
+):
+    path = resources.attachment_store.thumbnail_path_for(sha256)
+    if not os.path.exists(path):
+        raise HTTPException(404, "Thumbnail not ready")
+    return FileResponse(
+        path, media_type="image/jpeg",
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": f'"{sha256}-thumb"'},
+    )
 
 # ----------------------------------------------------------------------------
 # Volunteer Teams
 # ----------------------------------------------------------------------------
-@app.post("/teams", response_model=TeamRead)
-def create_team(payload: TeamCreate, session: Session = Depends(get_session)):
+@router.post("/teams", response_model=TeamRead)
+def create_team(
+    payload: TeamCreate,
+    session: Session = Depends(get_session), resources: Resources = Depends(get_resources),
+):
     t = Team(name=payload.name, area=payload.area, description=payload.description)
     session.add(t)
     session.commit()
+    resources.assignment_index.invalidate()
     session.refresh(t)
     return _team_to_read(session, t)
 
-@app.get("/teams", response_model=List[TeamRead])
-def list_teams(active: Optional[bool] = None, session: Session = Depends(get_session)):
+@router.get("/teams", response_model=List[TeamRead])
+def list_teams(active: Optional[bool] = None, session: Session = Depends(read_session("list_teams"))):
     q = select(Team)
     if active is not None:
         q = q.where(Team.is_active == active)
     rows = session.exec(q.order_by(Team.created_at.desc())).all()
     return [_team_to_read(session, t) for t in rows]
 
-@app.get("/teams/active", response_model=List[TeamRead])
-def list_active_teams(session: Session = Depends(get_session)):
+@router.get("/teams/active", response_model=List[TeamRead])
+def list_active_teams(session: Session = Depends(read_session("list_active_teams"))):
     rows = session.exec(select(Team).where(Team.is_active == True).order_by(Team.created_at.desc())).all()
     return [_team_to_read(session, t) for t in rows]
 
-@app.get("/teams/{team_id}", response_model=TeamDetail)
-def get_team(team_id: int, session: Session = Depends(get_session)):
+@router.get("/teams/{team_id}", response_model=TeamDetail)
+def get_team(team_id: int, session: Session = Depends(read_session("get_team"))):
     t = session.get(Team, team_id)
     if not t:
         raise HTTPException(404, "Team not found")
     return _team_to_detail(session, t)
 
-@app.post("/teams/{team_id}/join", response_model=TeamDetail)
-def join_team(team_id: int, payload: TeamMemberJoin, session: Session = Depends(get_session)):
+@router.post("/teams/{team_id}/join", response_model=TeamDetail)
+def join_team(
+    team_id: int, payload: TeamMemberJoin,
+    session: Session = Depends(get_session), resources: Resources = Depends(get_resources),
+):
     t = session.get(Team, team_id)
     if not t:
         raise HTTPException(404, "Team not found")
@@ -754,11 +1272,15 @@ def join_team(team_id: int, payload: TeamMemberJoin, session: Session = Depends(
             )
         )
     session.commit()
+    resources.assignment_index.invalidate()
 
     return _team_to_detail(session, t)
 
-@app.patch("/teams/{team_id}", response_model=TeamRead)
-def update_team(team_id: int, payload: TeamUpdate, session: Session = Depends(get_session)):
+@router.patch("/teams/{team_id}", response_model=TeamRead)
+def update_team(
+    team_id: int, payload: TeamUpdate,
+    session: Session = Depends(get_session), resources: Resources = Depends(get_resources),
+):
     t = session.get(Team, team_id)
     if not t:
         raise HTTPException(404, "Team not found")
@@ -773,14 +1295,30 @@ def update_team(team_id: int, payload: TeamUpdate, session: Session = Depends(ge
     t.updated_at = datetime.utcnow()
     session.add(t)
     session.commit()
+    resources.assignment_index.invalidate()
     session.refresh(t)
     return _team_to_read(session, t)
 
+@router.get("/teams/{team_id}/assignments", response_model=List[AssignmentRead])
+def list_team_assignments(team_id: int, session: Session = Depends(read_session("list_team_assignments"))):
+    t = session.get(Team, team_id)
+    if not t:
+        raise HTTPException(404, "Team not found")
+    rows = session.exec(
+        select(TeamAssignment).where(TeamAssignment.team_id == team_id).order_by(TeamAssignment.assigned_at.desc())
+    ).all()
+    return [_assignment_to_read(a) for a in rows]
+
+@router.post("/assignments/run", response_model=AssignmentRun)
+def run_assignments(session: Session = Depends(get_session), resources: Resources = Depends(get_resources)):
+    made = run_assignment_pass(session, resources)
+    return AssignmentRun(assigned=len(made), assignments=made)
+
 # ----------------------------------------------------------------------------
 # Seed helpers
 # ----------------------------------------------------------------------------
-@app.post("/seed/example")
-def seed_example(session: Session = Depends(get_session)):
+@router.post("/seed/example")
+def seed_example(session: Session = Depends(get_session), resources: Resources = Depends(get_resources)):
     items = [
         SeedRep(role=RepRole.MNA, code="NA-247", name="Example MNA South",
                 phone="0300-0000000", email="mna.south@example.pk", district="Karachi South"),
@@ -791,9 +1329,77 @@ def seed_example(session: Session = Depends(get_session)):
         SeedRep(role=RepRole.MPA, code="PS-102", name="Example MPA East",
                 phone="0303-0000000", email="mpa.east@example.pk", district="Karachi East"),
     ]
-    return seed_representatives(items, session)
+    return seed_representatives(items, session, resources)
+
+@router.get("/metrics/cache")
+def cache_metrics(resources: Resources = Depends(get_resources)):
+    return {"summary": resources.summary_cache.stats()}
 
 # Health check endpoint
-@app.get("/health")
+@router.get("/health")
 def health_check():
-    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
\ No newline at end of file
+    return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+
+# ----------------------------------------------------------------------------
+# App factory
+# ----------------------------------------------------------------------------
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    settings = settings or Settings()
+    resources = Resources(settings)
+
+    app = FastAPI(title="Civic Complaints API", version="0.2.0")
+    app.state.resources = resources
+
+    # Enhanced CORS configuration
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:3000",
+            "http://127.0.0.1:3000",
+            "http://localhost:3001",
+            "http://127.0.0.1:3001",
+            "http://localhost:8000",
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.include_router(router)
+
+    def assignment_batch():
+        with Session(resources.engine) as session:
+            run_assignment_pass(session, resources)
+
+    # One worker runs the batch; the rest stand by on the job lock
+    app.state.assignment_job = PeriodicJob(
+        "assignment", settings.assignment_interval, assignment_batch,
+        lock_path=f"{settings.database_path}.assignment.lock",
+    )
+
+    # Snapshot copies happen here, never on a read request
+    app.state.snapshot_job = PeriodicJob(
+        "snapshot", settings.snapshot_refresh_interval, lambda: resources.replica.refresh_snapshot(),
+        lock_path=f"{settings.snapshot_path}.lock",
+    )
+
+    @app.on_event("startup")
+    def on_startup():
+        create_db_and_tables(resources)
+        logging.basicConfig(level=logging.INFO)
+        if settings.blocked_voters_path:
+            load_blocked_voters(resources, settings.blocked_voters_path)
+        if settings.assignment_mode == "periodic":
+            app.state.assignment_job.start()
+        if settings.read_mode == "snapshot":
+            app.state.snapshot_job.start()
+        logging.info("Civic Complaints API started successfully!")
+
+    @app.on_event("shutdown")
+    def on_shutdown():
+        app.state.assignment_job.stop()
+        app.state.snapshot_job.stop()
+        resources.close()
+
+    return app
+
+app = create_app()
@@ -0,0 +1,101 @@
+"""
+Team assignment planning.
+
+Teams are matched to complaints by area code: a team whose ``area`` is
+``"NA-247"`` or ``"PS-110"`` serves complaints carrying that code. For each
+area the planner keeps a min-heap of eligible teams ordered by open load per
+member, so picking the least-loaded team for a complaint costs O(log teams).
+``AssignmentIndex`` keeps the planner between passes and only rebuilds it
+after team, member or status changes (or ``max_age``, for other workers').
+"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def normalize_area(area: Optional[str]) -> Optional[str]:
+    return area.strip().upper() if area and area.strip() else None
+
+
+class AssignmentPlanner:
+    def __init__(self, teams: Iterable[Tuple[int, Optional[str], int, int]], max_open_per_member: float = 5.0):
+        """``teams`` yields ``(team_id, area, member_count, open_load)``."""
+        self.max_open_per_member = max_open_per_member
+        self._members: Dict[int, int] = {}
+        self._load: Dict[int, int] = {}
+        self._by_area: Dict[str, List[Tuple[float, int, int]]] = {}
+        for team_id, area, members, load in teams:
+            area = normalize_area(area)
+            # A team with no volunteers cannot take work
+            if not area or members <= 0:
+                continue
+            self._members[team_id] = members
+            self._load[team_id] = load
+            if self._has_capacity(team_id):
+                self._by_area.setdefault(area, []).append(self._entry(team_id))
+        for heap in self._by_area.values():
+            heapq.heapify(heap)
+
+    def _entry(self, team_id: int) -> Tuple[float, int, int]:
+        # Least load per member first; larger teams win ties
+        members = self._members[team_id]
+        return (self._load[team_id] / members, -members, team_id)
+
+    def _has_capacity(self, team_id: int) -> bool:
+        return self._load[team_id] < self._members[team_id] * self.max_open_per_member
+
+    def pick(self, *areas: Optional[str]) -> Optional[int]:
+        """Choose a team for a complaint with the given area codes and book it."""
+        best: Optional[Tuple[float, int, int]] = None
+        best_heap: Optional[List[Tuple[float, int, int]]] = None
+        for area in areas:
+            heap = self._by_area.get(normalize_area(area) or "")
+            if heap and (best is None or heap[0] < best):
+                best, best_heap = heap[0], heap
+        if best is None:
+            return None
+        team_id = best[2]
+        self._load[team_id] += 1
+        if self._has_capacity(team_id):
+            heapq.heapreplace(best_heap, self._entry(team_id))
+        else:
+            heapq.heappop(best_heap)
+        return team_id
+
+    def exhausted(self) -> bool:
+        """True when no team in any area can take another complaint."""
+        return not any(self._by_area.values())
+
+    def load(self, team_id: int) -> int:
+        return self._load.get(team_id, 0)
+
+
+class AssignmentIndex:
+    """Per-worker cache of the planner, kept across assignment passes.
+
+    Passes book their picks on the cached planner, so loads stay current
+    without re-aggregating. Local team/member/status writes call
+    ``invalidate``; changes made by other workers are picked up once the
+    planner is older than ``max_age`` seconds.
+    """
+
+    def __init__(self, max_age: float = 30.0):
+        self.max_age = max_age
+        self._planner: Optional[AssignmentPlanner] = None
+        self._built_at = 0.0
+        self.builds = 0
+
+    def get(self, build: Callable[[], AssignmentPlanner]) -> AssignmentPlanner:
+        now = time.monotonic()
+        planner = self._planner
+        if planner is None or now - self._built_at > self.max_age:
+            planner = self._planner = build()
+            self._built_at = now
+            self.builds += 1
+        return planner
+
+    def invalidate(self) -> None:
+        self._planner = None
@@ -0,0 +1,229 @@
+"""
+Content-addressed storage for complaint photos.
+
+Uploads are written chunk by chunk to a temp file while being hashed, then
+atomically renamed to ``<root>/<sha[:2]>/<sha[2:4]>/<sha>``. Identical
+photos therefore share one file on disk, and the SQLite database only holds
+metadata rows. ``MultipartUpload`` feeds the ``file`` part of a raw
+multipart body straight into the store, so uploads are never spooled and the
+size limit trips as soon as it is crossed. Thumbnails are rendered in a
+process pool so neither the event loop nor the request threads pay for image
+decoding.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+# Boundaries, part headers and small form fields around the file itself
+MULTIPART_OVERHEAD = 16 * 1024
+
+ALLOWED_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif"}
+
+
+class AttachmentTooLarge(Exception):
+    pass
+
+
+class UnsupportedContentType(Exception):
+    pass
+
+
+class InvalidUpload(Exception):
+    pass
+
+
+def make_thumbnail(src: str, dst: str, size: int) -> str:
+    """Render a JPEG thumbnail. Runs inside a worker process."""
+    from PIL import Image  # deferred: only worker processes need Pillow
+
+    with Image.open(src) as im:
+        im.thumbnail((size, size))
+        if im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        tmp = f"{dst}.{os.getpid()}.tmp"
+        im.save(tmp, "JPEG", quality=80, optimize=True)
+    os.replace(tmp, dst)
+    return dst
+
+
+class AttachmentStore:
+    def __init__(self, root: str, max_bytes: int, thumbnail_size: int = 320, thumbnail_workers: int = 2):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.thumbnail_size = thumbnail_size
+        self.thumbnail_workers = thumbnail_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def path_for(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def thumbnail_path_for(self, sha256: str) -> str:
+        return self.path_for(sha256) + ".thumb.jpg"
+
+    def open_writer(self) -> "AttachmentWriter":
+        return AttachmentWriter(self)
+
+    # ------------------------------------------------------------------
+    # Thumbnails
+    # ------------------------------------------------------------------
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: the server process is multi-threaded
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.thumbnail_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def schedule_thumbnail(self, sha256: str) -> Optional[Future]:
+        dst = self.thumbnail_path_for(sha256)
+        if os.path.exists(dst):
+            return None
+        fut = self._executor().submit(make_thumbnail, self.path_for(sha256), dst, self.thumbnail_size)
+        fut.add_done_callback(_log_thumbnail_failure)
+        return fut
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class AttachmentWriter:
+    """Hashes and writes one upload into the store as its chunks arrive."""
+
+    def __init__(self, store: AttachmentStore):
+        self.store = store
+        self.size = 0
+        self._digest = hashlib.sha256()
+        tmp_dir = os.path.join(store.root, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        self._out = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.store.max_bytes:
+            raise AttachmentTooLarge(f"Attachment exceeds {self.store.max_bytes} bytes")
+        self._digest.update(chunk)
+        self._out.write(chunk)
+
+    def commit(self) -> Tuple[str, int, bool]:
+        """Move the file to its content address; returns ``(sha256, size, created)``."""
+        self._out.close()
+        sha256 = self._digest.hexdigest()
+        final = self.store.path_for(sha256)
+        if os.path.exists(final):
+            os.unlink(self._tmp_path)
+            return sha256, self.size, False
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        os.replace(self._tmp_path, final)
+        return sha256, self.size, True
+
+    def abort(self) -> None:
+        self._out.close()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+
+
+class MultipartUpload:
+    """Incremental multipart/form-data parser that streams one file field.
+
+    Feed raw body chunks to ``feed``; bytes of the ``field`` part go to an
+    ``AttachmentWriter`` and every other part is discarded. Parsing errors
+    surface as ``InvalidUpload``, a disallowed part type as
+    ``UnsupportedContentType`` (before any of its bytes are written).
+    """
+
+    def __init__(self, store: AttachmentStore, content_type: str, field: str = "file"):
+        from python_multipart.multipart import MultipartParser, parse_options_header
+
+        mime, params = parse_options_header(content_type)
+        if mime != b"multipart/form-data" or not params.get(b"boundary"):
+            raise InvalidUpload("Expected a multipart/form-data body")
+        self.store = store
+        self.field = field.encode()
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.writer: Optional[AttachmentWriter] = None
+        self._parse_options = parse_options_header
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_name = b""
+        self._header_value = b""
+        self._in_file = False
+        self._parser = MultipartParser(params[b"boundary"], callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def feed(self, chunk: bytes) -> None:
+        from python_multipart.exceptions import FormParserError
+
+        try:
+            self._parser.write(chunk)
+        except FormParserError as e:
+            raise InvalidUpload("Invalid multipart body") from e
+
+    def finish(self) -> Tuple[str, int, bool]:
+        from python_multipart.exceptions import FormParserError
+
+        try:
+            self._parser.finalize()
+        except FormParserError as e:
+            raise InvalidUpload("Invalid multipart body") from e
+        if self.writer is None or self._in_file:
+            raise InvalidUpload(f"Missing file field '{self.field.decode()}'")
+        return self.writer.commit()
+
+    def abort(self) -> None:
+        if self.writer is not None:
+            self.writer.abort()
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_name.lower()] = self._header_value
+        self._header_name = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = self._parse_options(self._headers.get(b"content-disposition", b""))
+        if options.get(b"name") != self.field or b"filename" not in options or self.writer is not None:
+            return
+        content_type = self._headers.get(b"content-type", b"").decode("latin-1").strip()
+        if content_type not in ALLOWED_CONTENT_TYPES:
+            raise UnsupportedContentType(f"Unsupported content type: {content_type or None}")
+        self.content_type = content_type
+        self.filename = options[b"filename"].decode("utf-8", "replace")
+        self.writer = self.store.open_writer()
+        self._in_file = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self.writer.write(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_file = False
+
+
+def _log_thumbnail_failure(fut: Future) -> None:
+    if not fut.cancelled() and fut.exception() is not None:
+        logging.warning(f"Thumbnail generation failed: {fut.exception()}")
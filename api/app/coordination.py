@@ -0,0 +1,155 @@
+"""
+Cross-process coordination for multi-worker deployments.
+
+* ``startup_lock`` serialises schema creation/migration across workers.
+* ``DataVersion`` exposes SQLite's ``PRAGMA data_version`` so in-process
+  caches notice commits made by any connection, in any worker.
+* ``VersionedCache`` is a small dict cache dropped whenever that counter moves.
+* ``PeriodicJob`` runs a callable on a daemon thread at a fixed interval,
+  optionally in only one worker at a time.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import IO, Any, Callable, Dict, Hashable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-worker only
+    fcntl = None  # type: ignore[assignment]
+
+
+@contextmanager
+def startup_lock(path: str) -> Iterator[None]:
+    """Exclusive advisory file lock held for the duration of the block.
+
+    Every worker runs the startup hook; the first one to take the lock
+    migrates, the rest block until it is done and then find the schema
+    already current.
+    """
+    with open(path, "a") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+class DataVersion:
+    """Monotonic-ish change counter for a SQLite database file.
+
+    ``PRAGMA data_version`` changes whenever *another* connection commits, so
+    a dedicated connection that never writes sees every commit from this and
+    every other process. The pragma is answered from the pager without
+    touching any table, so polling it per request is cheap.
+    """
+
+    def __init__(self, database_path: str):
+        self.database_path = database_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def current(self) -> int:
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(
+                    f"file:{self.database_path}?mode=ro", uri=True, check_same_thread=False
+                )
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class VersionedCache:
+    """Process-local cache invalidated wholesale when the data version moves."""
+
+    def __init__(self, version: DataVersion):
+        self.version = version
+        self._seen: Optional[int] = None
+        self._data: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        v = self.version.current()
+        with self._lock:
+            if v != self._seen:
+                self._data.clear()
+                self._seen = v
+            if key in self._data:
+                return self._data[key]
+        value = loader()
+        # Only keep it if nothing was committed while we were loading
+        if self.version.current() == v:
+            with self._lock:
+                if self._seen == v:
+                    self._data[key] = value
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._seen = None
+
+
+class PeriodicJob:
+    """Runs ``fn`` every ``interval`` seconds on a daemon thread.
+
+    With ``lock_path`` set, only the worker holding a non-blocking flock on
+    that file runs the job. The others retry every tick, so one of them
+    takes over if the holder exits.
+    """
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], Any], lock_path: Optional[str] = None):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.lock_path = lock_path
+        self._lock_file: Optional[IO[str]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_leader(self) -> bool:
+        if self.lock_path is None or fcntl is None:
+            return True
+        if self._lock_file is None:
+            fh = open(self.lock_path, "a")
+            try:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                fh.close()
+                return False
+            # Held (file kept open) until stop() or process exit
+            self._lock_file = fh
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                if self.is_leader():
+                    self.fn()
+            except Exception as e:
+                logging.error(f"Periodic job {self.name} failed: {e}")
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
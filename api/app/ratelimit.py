@@ -0,0 +1,119 @@
+"""
+In-process abuse throttling for voting.
+
+* ``TokenBucketLimiter`` keeps one ``(tokens, last_refill)`` tuple per key in
+  a plain dict, refills lazily on access and sweeps idle keys after a TTL.
+* ``BloomFilter`` is a fixed-size bit array for a bulk-loaded list of
+  known-bad voter ids; membership costs k hash probes and no DB access.
+
+State is per process: with N workers the effective limit is N times the
+configured one, which is fine for flood protection.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class TokenBucketLimiter:
+    def __init__(self, rate: float, burst: float, ttl: float = 600.0, max_keys: int = 100_000):
+        self.rate = rate  # tokens per second
+        self.burst = burst
+        # An idle bucket is full again after burst/rate seconds, so dropping
+        # it after that point loses nothing
+        self.ttl = max(ttl, burst / rate)
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def take(self, key: str, now: Optional[float] = None) -> float:
+        """Consume one token. Returns 0.0 if allowed, else seconds until one is available."""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep or len(self._buckets) >= self.max_keys:
+                self._sweep(now)
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1.0:
+                self._buckets[key] = (tokens - 1.0, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1.0 - tokens) / self.rate
+
+    def _sweep(self, now: float) -> None:
+        cutoff = now - self.ttl
+        stale = [k for k, (_, last) in self._buckets.items() if last < cutoff]
+        for k in stale:
+            del self._buckets[k]
+        # Still over capacity under a flood of unique keys: drop the oldest
+        # inserted down to 90% so the next sweep is not on the very next call
+        overflow = len(self._buckets) - int(self.max_keys * 0.9)
+        if overflow > 0:
+            for k in list(self._buckets)[:overflow]:
+                del self._buckets[k]
+        self._next_sweep = now + self.ttl
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 1e-6):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Kirsch-Mitzenmacher: two 64-bit halves of one digest give k probes
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for p in self._positions(item):
+            self._bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        if not self.count:
+            return False
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+
+class VoteThrottle:
+    """Combines the blocklist and the per-IP / per-voter buckets for ``vote``."""
+
+    def __init__(self, voter_limiter: TokenBucketLimiter, ip_limiter: TokenBucketLimiter, blocked: BloomFilter):
+        self.voter_limiter = voter_limiter
+        self.ip_limiter = ip_limiter
+        self.blocked = blocked
+
+    def check(self, voter_id: str, client_ip: Optional[str]) -> Tuple[int, float]:
+        """Returns ``(status, retry_after)``: 200 to proceed, 403 if blocked, 429 if throttled."""
+        if voter_id in self.blocked:
+            return 403, 0.0
+        if client_ip:
+            wait = self.ip_limiter.take(client_ip)
+            if wait:
+                return 429, wait
+        wait = self.voter_limiter.take(voter_id)
+        if wait:
+            return 429, wait
+        return 200, 0.0
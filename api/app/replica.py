@@ -0,0 +1,116 @@
+"""
+Read/write split for the SQLite store.
+
+Writers keep using the primary engine. Readers get sessions from a
+``ReadReplica`` which, depending on the configured mode, hands out either a
+read-only connection to the primary file or a connection to an immutable
+snapshot refreshed with the SQLite online backup API.
+
+Snapshots are refreshed off the request path (``refresh_snapshot`` is run by
+a background job in one worker). A read that finds the snapshot older than
+its staleness bound falls back to a live read-only connection instead of
+copying the database itself.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import time
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, create_engine
+
+
+def _ro_url(path: str, immutable: bool = False) -> str:
+    url = f"sqlite:///file:{path}?mode=ro&uri=true"
+    if immutable:
+        url += "&immutable=1"
+    return url
+
+
+class ReadReplica:
+    def __init__(
+        self,
+        primary: Engine,
+        database_path: str,
+        mode: str = "ro",
+        snapshot_path: Optional[str] = None,
+        max_staleness: float = 5.0,
+    ):
+        self.primary = primary
+        self.database_path = database_path
+        self.mode = mode
+        self.snapshot_path = snapshot_path or f"{database_path}.snapshot"
+        self.max_staleness = max_staleness
+        self._ro_engine: Optional[Engine] = None
+        self._snapshot_engine: Optional[Engine] = None
+
+    # ------------------------------------------------------------------
+    # Engines
+    # ------------------------------------------------------------------
+    @property
+    def ro_engine(self) -> Engine:
+        if self._ro_engine is None:
+            self._ro_engine = create_engine(
+                _ro_url(self.database_path),
+                echo=False,
+                connect_args={"check_same_thread": False},
+            )
+        return self._ro_engine
+
+    @property
+    def snapshot_engine(self) -> Engine:
+        # NullPool: every session opens whichever snapshot file is current,
+        # so a refresh (atomic rename) is picked up without a pool reset.
+        if self._snapshot_engine is None:
+            self._snapshot_engine = create_engine(
+                _ro_url(self.snapshot_path, immutable=True),
+                echo=False,
+                poolclass=NullPool,
+            )
+        return self._snapshot_engine
+
+    # ------------------------------------------------------------------
+    # Snapshot management
+    # ------------------------------------------------------------------
+    def snapshot_age(self) -> float:
+        """Seconds since the snapshot file was last replaced (inf if missing).
+
+        Uses the file mtime so every worker process shares the same clock.
+        """
+        try:
+            return time.time() - os.stat(self.snapshot_path).st_mtime
+        except FileNotFoundError:
+            return float("inf")
+
+    def refresh_snapshot(self) -> None:
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        src = sqlite3.connect(f"file:{self.database_path}?mode=ro", uri=True)
+        try:
+            dst = sqlite3.connect(tmp_path)
+            try:
+                src.backup(dst)
+                # An immutable reader must not look for a -wal file
+                dst.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                dst.close()
+        finally:
+            src.close()
+        os.replace(tmp_path, self.snapshot_path)
+        logging.debug("Read snapshot refreshed: %s", self.snapshot_path)
+
+    # ------------------------------------------------------------------
+    # Sessions
+    # ------------------------------------------------------------------
+    def session(self, max_staleness: Optional[float] = None) -> Session:
+        if max_staleness is None:
+            max_staleness = self.max_staleness
+        if self.mode == "primary":
+            return Session(self.primary)
+        if self.mode == "snapshot" and self.snapshot_age() <= max_staleness:
+            return Session(self.snapshot_engine)
+        return Session(self.ro_engine)
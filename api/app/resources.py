@@ -0,0 +1,114 @@
+"""
+Per-app runtime resources, built lazily from ``Settings``.
+
+Nothing here touches the filesystem or opens a connection until first use,
+so importing the package and calling ``create_app`` stay cheap. Rarely used
+subsystems (photo storage and its process pool) are imported on demand.
+"""
+
+from __future__ import annotations
+
+import os
+from functools import cached_property
+from typing import TYPE_CHECKING
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlmodel import create_engine
+
+from .assignment import AssignmentIndex
+from .coordination import DataVersion, VersionedCache
+from .ratelimit import BloomFilter, TokenBucketLimiter, VoteThrottle
+from .replica import ReadReplica
+from .settings import Settings
+from .sla import SlaTracker
+from .summary_cache import SummaryCache
+
+if TYPE_CHECKING:
+    from .attachments import AttachmentStore
+
+
+def _set_sqlite_pragmas(dbapi_conn, _record):
+    # WAL lets read-only connections proceed while a writer holds the lock
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+class Resources:
+    def __init__(self, settings: Settings):
+        self.settings = settings
+
+    @cached_property
+    def engine(self) -> Engine:
+        # Ensure data folder exists
+        os.makedirs(os.path.dirname(self.settings.database_path) or ".", exist_ok=True)
+        engine = create_engine(f"sqlite:///{self.settings.database_path}", echo=False)
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
+
+    @cached_property
+    def replica(self) -> ReadReplica:
+        # Reads are routed here; see app/replica.py for the available modes
+        return ReadReplica(
+            self.engine,
+            self.settings.database_path,
+            mode=self.settings.read_mode,
+            snapshot_path=self.settings.snapshot_path,
+            max_staleness=self.settings.read_max_staleness,
+        )
+
+    @cached_property
+    def data_version(self) -> DataVersion:
+        # Bumps on every commit from any worker; process-local caches key off it
+        return DataVersion(self.settings.database_path)
+
+    @cached_property
+    def impact_cache(self) -> VersionedCache:
+        return VersionedCache(self.data_version)
+
+    @cached_property
+    def sla_tracker(self) -> SlaTracker:
+        return SlaTracker(self.settings.sla_hours)
+
+    @cached_property
+    def assignment_index(self) -> AssignmentIndex:
+        return AssignmentIndex(self.settings.assignment_index_max_age)
+
+    @cached_property
+    def summary_cache(self) -> SummaryCache:
+        return SummaryCache(self.settings.summary_cache_size, self.settings.summary_cache_max_age)
+
+    @cached_property
+    def attachment_store(self) -> "AttachmentStore":
+        from .attachments import AttachmentStore
+
+        return AttachmentStore(
+            self.settings.attachments_dir,
+            max_bytes=self.settings.attachment_max_bytes,
+            thumbnail_size=self.settings.thumbnail_size,
+            thumbnail_workers=self.settings.thumbnail_workers,
+        )
+
+    @cached_property
+    def vote_throttle(self) -> VoteThrottle:
+        s = self.settings
+        return VoteThrottle(
+            voter_limiter=TokenBucketLimiter(
+                s.vote_rate_per_voter, s.vote_burst_per_voter,
+                ttl=s.vote_limiter_ttl, max_keys=s.vote_limiter_max_keys,
+            ),
+            ip_limiter=TokenBucketLimiter(
+                s.vote_rate_per_ip, s.vote_burst_per_ip,
+                ttl=s.vote_limiter_ttl, max_keys=s.vote_limiter_max_keys,
+            ),
+            blocked=BloomFilter(s.blocked_voters_capacity, s.blocked_voters_error_rate),
+        )
+
+    def close(self) -> None:
+        # Only tear down what was actually built
+        if "attachment_store" in self.__dict__:
+            self.attachment_store.shutdown()
+        if "data_version" in self.__dict__:
+            self.data_version.close()
@@ -0,0 +1,72 @@
+"""
+Runtime configuration for the Civic Complaints API.
+
+Every field can be overridden with a ``CIVIC_``-prefixed environment variable,
+e.g. ``CIVIC_READ_MODE=snapshot``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Literal, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="CIVIC_")
+
+    # Primary (writer) SQLite file
+    database_path: str = "data/civic.db"
+
+    # Where read-only endpoints get their connections from:
+    #   primary  - share the writer engine (pre-0.3 behaviour)
+    #   ro       - separate pool opened on the primary file with mode=ro
+    #   snapshot - immutable copy made with the SQLite backup API
+    read_mode: Literal["primary", "ro", "snapshot"] = "ro"
+    snapshot_path: str = "data/civic.snapshot.db"
+    # Seconds a snapshot may lag the primary; older snapshots are bypassed
+    # for a live read-only connection
+    read_max_staleness: float = 5.0
+    # Background refresh period (one worker); keep it below read_max_staleness
+    snapshot_refresh_interval: float = 2.0
+    # Per-route overrides keyed by route name; 0 forces a live read
+    read_route_staleness: Dict[str, float] = {}
+
+    # Photo attachments (content-addressed files, metadata in SQLite)
+    attachments_dir: str = "data/attachments"
+    attachment_max_bytes: int = 10 * 1024 * 1024
+    thumbnail_size: int = 320
+    thumbnail_workers: int = 2
+
+    # Vote throttling (token buckets, per worker process)
+    vote_rate_per_voter: float = 0.2  # tokens/second
+    vote_burst_per_voter: int = 10
+    vote_rate_per_ip: float = 2.0
+    vote_burst_per_ip: int = 60
+    vote_limiter_ttl: float = 600.0
+    vote_limiter_max_keys: int = 100_000
+    # Newline-separated voter ids loaded into a Bloom filter at startup
+    blocked_voters_path: Optional[str] = None
+    blocked_voters_capacity: int = 100_000
+    blocked_voters_error_rate: float = 1e-6
+
+    # Resolution SLA used by the overdue index
+    sla_hours: float = 48.0
+
+    # Automatic team assignment:
+    #   off       - only via POST /assignments/run
+    #   on_create - each new complaint is matched immediately
+    #   periodic  - a batch pass every assignment_interval seconds, run by
+    #               one worker at a time
+    assignment_mode: Literal["off", "on_create", "periodic"] = "periodic"
+    assignment_interval: float = 60.0
+    # Seconds the cached team index may miss other workers' team changes
+    assignment_index_max_age: float = 30.0
+    assignment_batch_size: int = 5000
+    assignment_max_open_per_member: float = 5.0
+
+    # Hot-set cache of serialized complaint summaries (per worker)
+    summary_cache_size: int = 512
+    summary_cache_max_age: float = 60.0
+    # How often to check the event log for other workers' writes
+    summary_cache_sync_interval: float = 0.5
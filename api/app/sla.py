@@ -0,0 +1,120 @@
+"""
+Incremental SLA tracking over the complaint event log.
+
+``SlaTracker`` is fed events in id order (``track`` / ``transition``) and keeps:
+
+* the current ``(status, since)`` of every complaint,
+* completed-interval aggregates per ``(area code, status)``,
+* a min-heap of resolution deadlines for open complaints.
+
+Listing overdue complaints walks only the heap entries whose deadline has
+passed (a parent later than ``now`` prunes its whole subtree), so the cost is
+proportional to the answer, not to the number of complaints. Entries for
+complaints that have since closed are dropped lazily.
+"""
+
+from __future__ import annotations
+
+import heapq
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+TERMINAL_STATUSES = {"resolved", "rejected"}
+
+
+@dataclass
+class DurationStats:
+    total_seconds: float = 0.0
+    count: int = 0
+
+    @property
+    def avg_hours(self) -> float:
+        return round(self.total_seconds / self.count / 3600.0, 2) if self.count else 0.0
+
+
+class SlaTracker:
+    def __init__(self, sla_hours: float = 48.0):
+        self.sla = timedelta(hours=sla_hours)
+        self.last_event_id = 0
+        self.synced_version: Optional[int] = None  # DataVersion seen at last sync
+        self.lock = threading.Lock()
+        self._state: Dict[int, Tuple[str, datetime]] = {}
+        self._areas: Dict[int, Tuple[Optional[str], ...]] = {}
+        self._deadlines: Dict[int, datetime] = {}  # open complaints only
+        self._heap: List[Tuple[datetime, int]] = []
+        self.durations: Dict[Tuple[str, str], DurationStats] = {}
+
+    # ------------------------------------------------------------------
+    # Feeding
+    # ------------------------------------------------------------------
+    def track(self, complaint_id: int, status: str, since: datetime, created_at: datetime,
+              areas: Tuple[Optional[str], ...]) -> None:
+        """Register a complaint's current state (bootstrap and ``created`` events)."""
+        if complaint_id in self._state:
+            return
+        self._state[complaint_id] = (status, since)
+        self._areas[complaint_id] = areas
+        if status not in TERMINAL_STATUSES:
+            self._open(complaint_id, created_at + self.sla)
+
+    def transition(self, complaint_id: int, to_status: str, at: datetime, created_at: datetime,
+                   areas: Tuple[Optional[str], ...]) -> None:
+        prev = self._state.get(complaint_id)
+        if prev is None:
+            self.track(complaint_id, to_status, at, created_at, areas)
+            return
+        from_status, since = prev
+        if from_status == to_status:
+            return
+        seconds = max((at - since).total_seconds(), 0.0)
+        for area in self._areas.get(complaint_id, areas):
+            if area:
+                stats = self.durations.setdefault((area, from_status), DurationStats())
+                stats.total_seconds += seconds
+                stats.count += 1
+        self._state[complaint_id] = (to_status, at)
+        if to_status in TERMINAL_STATUSES:
+            self._deadlines.pop(complaint_id, None)
+        elif complaint_id not in self._deadlines:
+            # Re-opened: the original resolution deadline still applies
+            self._open(complaint_id, created_at + self.sla)
+
+    def _open(self, complaint_id: int, deadline: datetime) -> None:
+        self._deadlines[complaint_id] = deadline
+        heapq.heappush(self._heap, (deadline, complaint_id))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def overdue(self, now: datetime) -> List[Tuple[int, datetime]]:
+        """Open complaints whose deadline is at or before ``now``, earliest first."""
+        self._compact()
+        heap = self._heap
+        found: List[Tuple[datetime, int]] = []
+        seen: Set[int] = set()
+        stack = [0] if heap else []
+        while stack:
+            i = stack.pop()
+            deadline, cid = heap[i]
+            if deadline > now:
+                continue
+            # A re-opened complaint can have a duplicate (deadline, id) entry
+            if self._deadlines.get(cid) == deadline and cid not in seen:
+                seen.add(cid)
+                found.append((deadline, cid))
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    stack.append(child)
+        found.sort()
+        return [(cid, deadline) for deadline, cid in found]
+
+    def _compact(self) -> None:
+        # Rebuild once stale (closed) entries dominate the heap
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(d, cid) for cid, d in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def open_count(self) -> int:
+        return len(self._deadlines)
@@ -0,0 +1,98 @@
+"""
+Bounded LRU cache of serialized complaint summaries.
+
+Entries hold the ready-to-send JSON for both ``/complaints/{id}/summary`` and
+``/complaints/{id}``, so a hit is a dict lookup and a bytes copy with no
+database access. Writers invalidate precisely by complaint id; other workers'
+writes are picked up from the event log (see ``sync_summary_cache``), with
+``max_age`` as a backstop for changes that are not logged.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+@dataclass
+class CachedSummary:
+    summary_json: bytes
+    complaint_json: bytes
+    rep_ids: Tuple[int, ...] = ()
+    stored_at: float = field(default_factory=time.monotonic)
+
+
+class SummaryCache:
+    def __init__(self, max_entries: int = 512, max_age: float = 60.0):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._data: "OrderedDict[int, CachedSummary]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation; a fill that started before one is dropped
+        self.epoch = 0
+        # Cross-worker sync state
+        self.synced_version: Optional[int] = None
+        self.last_event_id: Optional[int] = None
+        self.next_sync = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, complaint_id: int) -> Optional[CachedSummary]:
+        with self._lock:
+            entry = self._data.get(complaint_id)
+            if entry is not None and time.monotonic() - entry.stored_at > self.max_age:
+                del self._data[complaint_id]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(complaint_id)
+            self.hits += 1
+            return entry
+
+    def put(self, complaint_id: int, entry: CachedSummary, epoch: int) -> None:
+        with self._lock:
+            if epoch != self.epoch:
+                return
+            self._data[complaint_id] = entry
+            self._data.move_to_end(complaint_id)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, complaint_ids: Iterable[int]) -> None:
+        with self._lock:
+            self.epoch += 1
+            for cid in complaint_ids:
+                if self._data.pop(cid, None) is not None:
+                    self.invalidations += 1
+
+    def invalidate_where(self, predicate: Callable[[CachedSummary], bool]) -> None:
+        with self._lock:
+            self.epoch += 1
+            for cid in [cid for cid, e in self._data.items() if predicate(e)]:
+                del self._data[cid]
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.epoch += 1
+            self._data.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,87 @@
+"""
+Cold-start benchmark: fresh interpreter -> create_app() -> startup -> first request.
+
+Run (from api/):
+  python benchmarks/startup.py [--runs 10] [--target-ms 1500]
+
+Each run is a new process against a scratch copy of the database whose schema
+was verified by a warm-up run, i.e. the normal restart/autoscale case. The
+target applies to the end-to-end wall time of that process: interpreter
+start, every import, create_app, the startup hook and the first
+GET /complaints. For orientation the framework imports (FastAPI, SQLModel,
+pydantic, the SQLite dialect, TestClient) are also reported separately from
+what this app adds on top. Exits non-zero if the end-to-end median exceeds
+the target.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+# Framework floor: paid by any FastAPI + SQLModel-on-SQLite app. FastAPI
+# imports pydantic.v1 on the first route, SQLAlchemy the dialect on the first
+# engine; import them up front so they are not billed to the app.
+import fastapi, sqlmodel, pydantic_settings, pydantic.v1, sqlalchemy.dialects.sqlite
+from fastapi.testclient import TestClient    # harness only
+t1 = time.perf_counter()
+from app import create_app
+from app.settings import Settings
+app = create_app(Settings(database_path=sys.argv[1], attachments_dir=sys.argv[2]))
+with TestClient(app) as client:
+    assert client.get("/complaints").status_code == 200
+t2 = time.perf_counter()
+print(json.dumps({"framework_ms": (t1 - t0) * 1e3, "app_ms": (t2 - t1) * 1e3}))
+"""
+
+
+def run_once(db: str, att: str) -> dict:
+    t0 = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", CHILD, db, att],
+        cwd=API_DIR, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["wall_ms"] = (time.perf_counter() - t0) * 1e3
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    # Measured at ~900-1000 ms end to end on the dev box; the margin keeps
+    # the check from flipping between runs
+    parser.add_argument("--target-ms", type=float, default=1500.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "civic.db")
+        src = os.path.join(API_DIR, "data", "civic.db")
+        if os.path.exists(src):
+            shutil.copy(src, db)
+        att = os.path.join(tmp, "attachments")
+
+        run_once(db, att)  # warm-up: migrates and records the schema fingerprint
+        results = [run_once(db, att) for _ in range(args.runs)]
+
+    framework = statistics.median(r["framework_ms"] for r in results)
+    app_ms = statistics.median(r["app_ms"] for r in results)
+    wall = statistics.median(r["wall_ms"] for r in results)
+    print(f"framework imports : {framework:7.1f} ms (median of {args.runs})")
+    print(f"app on top        : {app_ms:7.1f} ms")
+    print(f"end to end        : {wall:7.1f} ms (target {args.target_ms:.0f} ms)")
+    return 0 if wall <= args.target_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+"""
+Gunicorn config for multi-worker serving.
+
+Run (from api/):
+  gunicorn app:app -c gunicorn.conf.py
+
+Each worker is a separate process with its own read pool; schema migration
+at startup is serialised by a file lock (see app/coordination.py).
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("CIVIC_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("CIVIC_WORKERS", multiprocessing.cpu_count()))
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# Import the app in each worker, not the master: SQLite connections and
+# locks must not be shared across fork().
+preload_app = False
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = "-"
+errorlog = "-"
@@ -0,0 +1,40 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# The module-level `app` reads CIVIC_* at import time: point it at a scratch
+# directory so no test writes to the tracked data/civic.db
+_SCRATCH = tempfile.mkdtemp(prefix="civic-tests-")
+os.environ["CIVIC_DATABASE_PATH"] = os.path.join(_SCRATCH, "civic.db")
+os.environ["CIVIC_SNAPSHOT_PATH"] = os.path.join(_SCRATCH, "civic.snapshot.db")
+os.environ["CIVIC_ATTACHMENTS_DIR"] = os.path.join(_SCRATCH, "attachments")
+
+from app import app, create_db_and_tables  # noqa: E402
+from app.settings import Settings  # noqa: E402
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _scratch_schema():
+    # test_sample.py uses a bare TestClient(app), which never runs the startup hook
+    create_db_and_tables(app.state.resources)
+    yield
+    app.state.resources.close()
+    shutil.rmtree(_SCRATCH, ignore_errors=True)
+
+
+@pytest.fixture
+def tmp_settings(tmp_path):
+    """Factory for Settings whose database and files live under ``tmp_path``."""
+
+    def make(**overrides) -> Settings:
+        fields = {
+            "database_path": str(tmp_path / "civic.db"),
+            "snapshot_path": str(tmp_path / "civic.snapshot.db"),
+            "attachments_dir": str(tmp_path / "attachments"),
+        }
+        fields.update(overrides)
+        return Settings(**fields)
+
+    return make
@@ -0,0 +1,97 @@
+import io
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app as civic
+from app.attachments import AttachmentStore, AttachmentTooLarge, MultipartUpload, make_thumbnail
+
+
+def _store(store: AttachmentStore, data: bytes):
+    writer = store.open_writer()
+    writer.write(data)
+    return writer.commit()
+
+
+def test_store_deduplicates_by_hash(tmp_path):
+    store = AttachmentStore(str(tmp_path), max_bytes=1024)
+    sha1, size1, created1 = _store(store, b"same bytes")
+    sha2, size2, created2 = _store(store, b"same bytes")
+    assert sha1 == sha2 and size1 == size2 == 10
+    assert created1 and not created2
+    assert os.path.exists(store.path_for(sha1))
+    # temp files never linger
+    assert os.listdir(tmp_path / "tmp") == []
+
+    writer = store.open_writer()
+    with pytest.raises(AttachmentTooLarge):
+        writer.write(b"x" * 2048)
+    writer.abort()
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+def test_make_thumbnail(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    src, dst = str(tmp_path / "src.png"), str(tmp_path / "thumb.jpg")
+    Image.new("RGBA", (1200, 800), (255, 0, 0, 255)).save(src)
+    make_thumbnail(src, dst, 320)
+    with Image.open(dst) as im:
+        assert im.size == (320, 213)
+
+
+def test_multipart_upload_streams_into_store(tmp_path):
+    store = AttachmentStore(str(tmp_path), max_bytes=1000)
+    head = b'--xx\r\nContent-Disposition: form-data; name="file"; filename="a.png"\r\nContent-Type: image/png\r\n\r\n'
+
+    upload = MultipartUpload(store, "multipart/form-data; boundary=xx")
+    for chunk in (head, b"a" * 300, b"b" * 300, b"\r\n--xx--\r\n"):
+        upload.feed(chunk)
+    sha, size, created = upload.finish()
+    assert (size, created, upload.filename, upload.content_type) == (600, True, "a.png", "image/png")
+    assert open(store.path_for(sha), "rb").read() == b"a" * 300 + b"b" * 300
+
+    # The limit trips on the chunk that crosses it, not at the end of the body
+    upload = MultipartUpload(store, "multipart/form-data; boundary=xx")
+    upload.feed(head + b"c" * 900)
+    with pytest.raises(AttachmentTooLarge):
+        upload.feed(b"c" * 200)
+    upload.abort()
+    assert os.listdir(tmp_path / "tmp") == []
+
+
+def test_upload_and_serve_with_thumbnail(tmp_path, tmp_settings):
+    Image = pytest.importorskip("PIL.Image")
+    settings = tmp_settings(attachment_max_bytes=64 * 1024, assignment_mode="off")
+    png = io.BytesIO()
+    Image.new("RGB", (800, 600), (0, 128, 255)).save(png, "PNG")
+    body = png.getvalue()
+
+    with TestClient(civic.create_app(settings)) as client:
+        cid = client.post("/complaints", json={"title": "Photo test", "lat": 24.83, "lng": 67.06}).json()["id"]
+
+        r = client.post(f"/complaints/{cid}/attachments", files={"file": ("a.png", body, "image/png")})
+        assert r.status_code == 200, r.text
+        att = r.json()
+        assert att["size"] == len(body) and att["filename"] == "a.png"
+
+        r = client.get(att["url"], headers={"Range": "bytes=0-99"})
+        assert r.status_code == 206
+        assert r.content == body[:100]
+        assert "immutable" in r.headers["cache-control"]
+
+        # Rendered by the process pool; the first spawn can take a moment
+        deadline = time.monotonic() + 30
+        while (r := client.get(att["thumbnail_url"])).status_code == 404 and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert r.status_code == 200
+        with Image.open(io.BytesIO(r.content)) as thumb:
+            assert thumb.format == "JPEG" and thumb.size == (320, 240)
+
+        r = client.post(f"/complaints/{cid}/attachments", files={"file": ("a.txt", b"hi", "text/plain")})
+        assert r.status_code == 415
+        # Rejected on Content-Length before the body is read
+        r = client.post(f"/complaints/{cid}/attachments", files={"file": ("big.png", b"x" * 200_000, "image/png")})
+        assert r.status_code == 413
+        assert os.listdir(tmp_path / "attachments" / "tmp") == []
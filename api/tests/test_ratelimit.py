@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+
+import app as civic
+from app.ratelimit import BloomFilter, TokenBucketLimiter
+
+
+def test_token_bucket_refills_and_evicts():
+    lim = TokenBucketLimiter(rate=1.0, burst=2, ttl=10, max_keys=1000)
+    assert lim.take("a", now=0.0) == 0.0
+    assert lim.take("a", now=0.0) == 0.0
+    assert lim.take("a", now=0.0) == 1.0  # empty: one second until the next token
+    assert lim.take("a", now=1.0) == 0.0
+
+    lim.take("b", now=1.0)
+    assert len(lim) == 2
+    # Next sweep is due at t=10; everything idle since before t=20-10 goes
+    lim.take("c", now=20.0)
+    assert len(lim) == 1
+
+
+def test_bloom_filter_membership():
+    bf = BloomFilter(capacity=1000, error_rate=1e-6)
+    bf.update(f"bad-{i}" for i in range(1000))
+    assert all(f"bad-{i}" in bf for i in range(1000))
+    assert sum(f"good-{i}" in bf for i in range(10000)) == 0
+
+
+def test_vote_flood_is_throttled(tmp_settings):
+    app = civic.create_app(tmp_settings())
+    vote_throttle = app.state.resources.vote_throttle
+    with TestClient(app) as client:
+        cid = client.post("/complaints", json={"title": "Flood", "lat": 24.83, "lng": 67.06}).json()["id"]
+        codes = [
+            client.post(f"/complaints/{cid}/vote", json={"voter_id": "spammer", "value": 1}).status_code
+            for _ in range(vote_throttle.voter_limiter.burst + 1)
+        ]
+        assert codes[:-1] == [200] * vote_throttle.voter_limiter.burst
+        assert codes[-1] == 429
+
+        vote_throttle.blocked.add("known-bad")
+        r = client.post(f"/complaints/{cid}/vote", json={"voter_id": "known-bad", "value": 1})
+        assert r.status_code == 403
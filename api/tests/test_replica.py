@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import time
+
+from sqlmodel import create_engine, text
+
+from app.replica import ReadReplica
+
+
+def _make_primary(tmp_path):
+    path = str(tmp_path / "primary.db")
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)")
+    con.execute("INSERT INTO item (name) VALUES ('a')")
+    con.commit()
+    return path, con
+
+
+def test_ro_mode_sees_committed_writes(tmp_path):
+    path, writer = _make_primary(tmp_path)
+    replica = ReadReplica(create_engine(f"sqlite:///{path}"), path, mode="ro")
+
+    writer.execute("INSERT INTO item (name) VALUES ('b')")
+    writer.commit()
+    with replica.session() as s:
+        assert s.exec(text("SELECT COUNT(*) FROM item")).one()[0] == 2
+        # Connection is read-only
+        try:
+            s.exec(text("INSERT INTO item (name) VALUES ('c')"))
+            assert False, "write through read replica should fail"
+        except Exception:
+            pass
+
+
+def test_snapshot_mode_respects_staleness(tmp_path, monkeypatch):
+    path, writer = _make_primary(tmp_path)
+    replica = ReadReplica(
+        create_engine(f"sqlite:///{path}"), path, mode="snapshot",
+        snapshot_path=str(tmp_path / "snap.db"), max_staleness=60,
+    )
+    replica.refresh_snapshot()
+
+    writer.execute("INSERT INTO item (name) VALUES ('b')")
+    writer.commit()
+
+    # Reads never copy the database; that is the background job's work
+    def no_copy():
+        raise AssertionError("read request refreshed the snapshot")
+
+    monkeypatch.setattr(replica, "refresh_snapshot", no_copy)
+
+    # Within the staleness bound the snapshot is reused
+    with replica.session() as s:
+        assert s.exec(text("SELECT COUNT(*) FROM item")).one()[0] == 1
+
+    # A zero bound routes to a live read-only connection
+    with replica.session(max_staleness=0) as s:
+        assert s.exec(text("SELECT COUNT(*) FROM item")).one()[0] == 2
+
+    # So does a snapshot the job has let fall behind
+    old = time.time() - 120
+    os.utime(replica.snapshot_path, (old, old))
+    with replica.session() as s:
+        assert s.exec(text("SELECT COUNT(*) FROM item")).one()[0] == 2
+
+    # A refresh picks up the new row
+    monkeypatch.undo()
+    replica.refresh_snapshot()
+    with replica.session() as s:
+        assert s.exec(text("SELECT COUNT(*) FROM item")).one()[0] == 2
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+import app as civic
+from app.sla import SlaTracker
+
+T0 = datetime(2025, 1, 1)
+
+
+def test_tracker_durations_and_overdue_heap():
+    t = SlaTracker(sla_hours=48)
+    t.track(1, "new", T0, T0, ("NA-247", "PS-110"))
+    t.track(2, "new", T0 + timedelta(hours=10), T0 + timedelta(hours=10), ("NA-242", "PS-102"))
+    t.track(3, "resolved", T0, T0, ("NA-247", "PS-110"))
+
+    assert t.overdue(T0 + timedelta(hours=47)) == []
+    assert [cid for cid, _ in t.overdue(T0 + timedelta(hours=60))] == [1, 2]
+
+    t.transition(1, "in_progress", T0 + timedelta(hours=6), T0, ("NA-247", "PS-110"))
+    t.transition(1, "resolved", T0 + timedelta(hours=30), T0, ("NA-247", "PS-110"))
+    assert t.durations[("NA-247", "new")].avg_hours == 6.0
+    assert t.durations[("PS-110", "in_progress")].avg_hours == 24.0
+    assert [cid for cid, _ in t.overdue(T0 + timedelta(hours=60))] == [2]
+
+    # Re-opening keeps the original deadline
+    t.transition(1, "in_progress", T0 + timedelta(hours=70), T0, ("NA-247", "PS-110"))
+    assert [cid for cid, _ in t.overdue(T0 + timedelta(hours=70))] == [1, 2]
+
+
+def test_status_changes_are_logged_and_tracked(tmp_settings):
+    app = civic.create_app(tmp_settings(assignment_mode="off"))
+    with TestClient(app) as client:
+        cid = client.post("/complaints", json={"title": "SLA", "lat": 24.83, "lng": 67.06}).json()["id"]
+        client.patch(f"/complaints/{cid}/status", json={"status": "in_progress"})
+        client.patch(f"/complaints/{cid}/status", json={"status": "in_progress"})  # no-op, not logged
+        client.post(f"/complaints/{cid}/vote", json={"voter_id": "sla-voter", "value": 1})
+
+        events = client.get(f"/complaints/{cid}/events").json()
+        assert [e["kind"] for e in events] == ["created", "status", "vote"]
+        assert events[1]["from_status"] == "new" and events[1]["to_status"] == "in_progress"
+        assert events[2]["value"] == 1 and "voter_id" not in events[2]
+
+        durations = client.get("/sla/durations", params={"area": "NA-247"}).json()
+        assert any(d["status"] == "new" and d["count"] >= 1 for d in durations)
+        # Vote events are never replayed into the tracker
+        assert app.state.resources.sla_tracker.last_event_id == events[1]["id"]
+        # Fresh complaint is well within its 48h SLA
+        assert cid not in [o["id"] for o in client.get("/sla/overdue").json()]
@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+
+import app as civic
+
+
+def test_factory_is_lazy_and_caches_schema_check(tmp_path, tmp_settings, monkeypatch):
+    db = tmp_path / "sub" / "civic.db"
+    app = civic.create_app(tmp_settings(database_path=str(db)))
+    # Nothing touches disk until startup
+    assert not (tmp_path / "sub").exists()
+
+    with TestClient(app) as client:
+        assert client.get("/complaints").json() == []
+    assert db.exists()
+
+    # Second cold start: user_version matches, so create_all/inspector are skipped
+    def boom(*_args, **_kwargs):
+        raise AssertionError("schema check should have been skipped")
+
+    monkeypatch.setattr(civic, "check_and_migrate_database", boom)
+    monkeypatch.setattr(civic.SQLModel.metadata, "create_all", boom)
+    app2 = civic.create_app(tmp_settings(database_path=str(db)))
+    with TestClient(app2) as client:
+        assert client.get("/health").status_code == 200
@@ -0,0 +1,72 @@
+from fastapi.testclient import TestClient
+
+import app as civic
+from app.summary_cache import CachedSummary, SummaryCache
+
+
+def _entry(n: int) -> CachedSummary:
+    return CachedSummary(summary_json=b"%d" % n, complaint_json=b"%d" % n)
+
+
+def test_lru_eviction_and_stale_fill():
+    cache = SummaryCache(max_entries=2)
+    for cid in (1, 2):
+        cache.put(cid, _entry(cid), cache.epoch)
+    assert cache.get(1) is not None  # 1 is now most recent
+    cache.put(3, _entry(3), cache.epoch)
+    assert cache.get(2) is None
+    assert cache.stats()["evictions"] == 1
+
+    # A fill that started before an invalidation is discarded
+    epoch = cache.epoch
+    cache.invalidate([1])
+    cache.put(1, _entry(1), epoch)
+    assert cache.get(1) is None
+
+
+def test_hot_summary_served_without_db(tmp_settings, monkeypatch):
+    app = civic.create_app(tmp_settings(summary_cache_sync_interval=3600))
+    with TestClient(app) as client:
+        cid = client.post("/complaints", json={"title": "Hot", "lat": 24.83, "lng": 67.06}).json()["id"]
+        first = client.get(f"/complaints/{cid}/summary").json()
+
+        def no_db(*_args, **_kwargs):
+            raise AssertionError("cache hit touched the database")
+
+        with monkeypatch.context() as m:
+            m.setattr(app.state.resources.replica, "session", no_db)
+            assert client.get(f"/complaints/{cid}/summary").json() == first
+            assert client.get(f"/complaints/{cid}").json()["title"] == "Hot"
+
+        # Writes through this worker invalidate precisely
+        client.post(f"/complaints/{cid}/vote", json={"voter_id": "hot-voter", "value": 1})
+        assert client.get(f"/complaints/{cid}/summary").json()["votes_total"] == 1
+        client.patch(f"/complaints/{cid}/status", json={"status": "resolved"})
+        assert client.get(f"/complaints/{cid}").json()["status"] == "resolved"
+
+        stats = client.get("/metrics/cache").json()["summary"]
+        assert stats["hits"] >= 2 and stats["invalidations"] >= 2
+
+
+def test_other_workers_writes_invalidate(tmp_settings):
+    # Two apps on one database stand in for two worker processes
+    a = TestClient(civic.create_app(tmp_settings(summary_cache_sync_interval=0)))
+    b = TestClient(civic.create_app(tmp_settings(summary_cache_sync_interval=0)))
+    with a, b:
+        cid = a.post("/complaints", json={"title": "Shared", "lat": 24.83, "lng": 67.06}).json()["id"]
+        assert b.get(f"/complaints/{cid}/summary").json()["votes_total"] == 0
+        a.post(f"/complaints/{cid}/vote", json={"voter_id": "worker-a", "value": 1})
+        assert b.get(f"/complaints/{cid}/summary").json()["votes_total"] == 1
+
+
+def test_snapshot_mode_refills_from_live_data(tmp_settings):
+    app = civic.create_app(tmp_settings(
+        read_mode="snapshot", read_max_staleness=3600, summary_cache_sync_interval=3600,
+    ))
+    with TestClient(app) as client:
+        cid = client.post("/complaints", json={"title": "Snap", "lat": 24.83, "lng": 67.06}).json()["id"]
+        app.state.resources.replica.refresh_snapshot()
+        assert client.get(f"/complaints/{cid}/summary").json()["votes_total"] == 0
+        client.post(f"/complaints/{cid}/vote", json={"voter_id": "snap-voter", "value": 1})
+        # The snapshot is still an hour "fresh", but the refill must not use it
+        assert client.get(f"/complaints/{cid}/summary").json()["votes_total"] == 1